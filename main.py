@@ -32,6 +32,99 @@ class DataResponse(BaseModel):
 # In-memory storage (in production, use a database)
 products_data = []
 
+class SingleFlight:
+    """Coalesce identical in-flight calls so they share one computation"""
+    def __init__(self):
+        self._in_flight = {}
+
+    async def do(self, key, fn):
+        """Run fn() for key, or join the call already running for key"""
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # Shield so one disconnecting caller does not cancel the shared work
+        return await asyncio.shield(task)
+
+class AdmissionController:
+    """Bound concurrency and queue depth for a class of endpoints"""
+    def __init__(self, name: str, max_concurrent: int, max_queue: int,
+                 queue_timeout: float, retry_after: int):
+        if max_concurrent < 1:
+            raise ValueError(f"{name} max_concurrent must be >= 1, got {max_concurrent}")
+        if max_queue < 0:
+            raise ValueError(f"{name} max_queue must be >= 0, got {max_queue}")
+        if queue_timeout <= 0:
+            raise ValueError(f"{name} queue_timeout must be > 0, got {queue_timeout}")
+        if retry_after < 0:
+            raise ValueError(f"{name} retry_after must be >= 0, got {retry_after}")
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._admitted = 0
+
+    def _reject(self, status_code: int, reason: str):
+        raise HTTPException(
+            status_code=status_code,
+            detail=f"{self.name} endpoint {reason}, please retry later",
+            headers={"Retry-After": str(self.retry_after)}
+        )
+
+    async def run(self, fn):
+        """Run fn() once a slot is free, shedding load when the queue is full"""
+        # Running plus queued requests; counted before any await so checks never race
+        if self._admitted >= self.max_concurrent + self.max_queue:
+            self._reject(429, "is overloaded")
+        self._admitted += 1
+        try:
+            if not self._semaphore.locked():
+                # Free slot: take it without yielding, whatever the Python version
+                await self._semaphore.acquire()
+            else:
+                try:
+                    await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+                except asyncio.TimeoutError:
+                    self._reject(503, "timed out waiting for capacity")
+            try:
+                return await fn()
+            finally:
+                self._semaphore.release()
+        finally:
+            self._admitted -= 1
+
+def _env_setting(name: str, default: str, cast):
+    """Read a numeric setting from the environment with a clear error on bad input"""
+    value = os.getenv(name, default)
+    try:
+        return cast(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a {cast.__name__}, got {value!r}") from None
+
+# Identical queries and concurrent refreshes share a single computation;
+# for refresh this is also the concurrency bound, as at most one scrape runs
+coalescer = SingleFlight()
+
+# Refresh callers wait this long for the shared scrape before being shed
+refresh_timeout = _env_setting("REFRESH_TIMEOUT", "30", float)
+refresh_retry_after = _env_setting("REFRESH_RETRY_AFTER", "5", int)
+if refresh_timeout <= 0:
+    raise ValueError(f"REFRESH_TIMEOUT must be > 0, got {refresh_timeout}")
+if refresh_retry_after < 0:
+    raise ValueError(f"REFRESH_RETRY_AFTER must be >= 0, got {refresh_retry_after}")
+
+# Read endpoint limits; excess load is shed with 429/503 and Retry-After
+read_admission = AdmissionController(
+    "Read",
+    max_concurrent=_env_setting("READ_MAX_CONCURRENT", "64", int),
+    max_queue=_env_setting("READ_MAX_QUEUE", "256", int),
+    queue_timeout=_env_setting("READ_QUEUE_TIMEOUT", "2", float),
+    retry_after=_env_setting("READ_RETRY_AFTER", "1", int)
+)
+
 class DataScraper:
     def __init__(self):
         self.session = requests.Session()
@@ -469,9 +562,25 @@ async def root():
             let allProducts = [];
             let filteredProducts = [];
             
+            // Retry requests shed by the server (429/503) after Retry-After plus jitter
+            async function fetchWithRetry(url, options = {}, maxRetries = 3) {
+                for (let attempt = 0; ; attempt++) {
+                    const response = await fetch(url, options);
+                    if ((response.status !== 429 && response.status !== 503) || attempt >= maxRetries) {
+                        return response;
+                    }
+                    const retryAfter = parseFloat(response.headers.get('Retry-After')) || 1;
+                    const delay = retryAfter * 1000 * (1 + Math.random());
+                    await new Promise(resolve => setTimeout(resolve, delay));
+                }
+            }
+            
             async function fetchProducts() {
                 try {
-                    const response = await fetch('/api/products');
+                    const response = await fetchWithRetry('/api/products');
+                    if (!response.ok) {
+                        throw new Error('Failed to load products');
+                    }
                     const data = await response.json();
                     allProducts = data.products;
                     filteredProducts = [...allProducts];
@@ -576,7 +685,7 @@ async def root():
                 showLoading();
                 hideError();
                 try {
-                    const response = await fetch('/api/refresh', { method: 'POST' });
+                    const response = await fetchWithRetry('/api/refresh', { method: 'POST' });
                     if (response.ok) {
                         await fetchProducts();
                     } else {
@@ -608,6 +717,18 @@ async def get_products(
     limit: int = Query(50, ge=1, le=100, description="Number of products to return")
 ):
     """Get products with optional filtering"""
+    # Raw strings, since the response echoes the caller's category as given
+    key = ("products", category, search, limit)
+
+    async def query():
+        # Run off the event loop so the admission slot is held while the work runs
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _query_products, category, search, limit)
+
+    return await coalescer.do(key, lambda: read_admission.run(query))
+
+def _query_products(category: Optional[str], search: Optional[str], limit: int) -> DataResponse:
+    """Filter the in-memory products for a single query"""
     filtered_products = products_data.copy()
     
     if category:
@@ -640,10 +761,30 @@ async def get_categories():
 
 @app.post("/api/refresh")
 async def refresh_data():
-    """Refresh product data"""
+    """Refresh product data
+
+    Concurrent refreshes join the scrape already in progress, so a joined
+    caller gets the result of a scrape that started before its own POST.
+    Callers still waiting after REFRESH_TIMEOUT get a 503; the scrape keeps
+    running and later refreshes join it.
+    """
+    try:
+        return await asyncio.wait_for(
+            coalescer.do("refresh", _scrape_products), timeout=refresh_timeout
+        )
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail="Refresh is still in progress, please retry later",
+            headers={"Retry-After": str(refresh_retry_after)}
+        )
+
+async def _scrape_products():
+    """Run the blocking scrape off the event loop and swap in the results"""
     global products_data
     try:
-        products_data = scraper.scrape_tech_products()
+        loop = asyncio.get_running_loop()
+        products_data = await loop.run_in_executor(None, scraper.scrape_tech_products)
         return {"message": "Data refreshed successfully", "total_products": len(products_data)}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to refresh data: {str(e)}")
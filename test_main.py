@@ -0,0 +1,270 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import main
+from main import AdmissionController, SingleFlight, app
+
+
+client = TestClient(app)
+
+
+def test_read_main():
+    response = client.get("/")
+    assert response.status_code == 200
+
+
+def test_get_products():
+    with TestClient(app) as c:
+        response = c.get("/api/products")
+    assert response.status_code == 200
+    data = response.json()
+    assert "products" in data
+    assert "total" in data
+
+
+def test_get_categories():
+    response = client.get("/api/categories")
+    assert response.status_code == 200
+    data = response.json()
+    assert "categories" in data
+
+
+# SingleFlight
+
+def test_single_flight_runs_one_computation():
+    async def scenario():
+        flight = SingleFlight()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return object()
+
+        results = await asyncio.gather(*[flight.do("key", compute) for _ in range(50)])
+        assert calls == 1
+        assert all(r is results[0] for r in results)
+        assert flight._in_flight == {}
+
+    asyncio.run(scenario())
+
+
+def test_single_flight_separates_keys_and_evicts_after_completion():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+
+        async def compute(key):
+            calls.append(key)
+            await asyncio.sleep(0.01)
+            return key
+
+        assert await asyncio.gather(flight.do("a", lambda: compute("a")),
+                                    flight.do("b", lambda: compute("b"))) == ["a", "b"]
+        # A later call after completion starts a fresh computation
+        assert await flight.do("a", lambda: compute("a")) == "a"
+        assert calls == ["a", "b", "a"]
+        assert flight._in_flight == {}
+
+    asyncio.run(scenario())
+
+
+def test_single_flight_shares_and_evicts_failures():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(*[flight.do("key", fail) for _ in range(3)],
+                                       return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert flight._in_flight == {}
+
+    asyncio.run(scenario())
+
+
+def test_single_flight_caller_cancel_does_not_cancel_shared_work():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return "done"
+
+        leader = asyncio.ensure_future(flight.do("key", compute))
+        follower = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await follower == "done"
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert flight._in_flight == {}
+
+    asyncio.run(scenario())
+
+
+# AdmissionController
+
+async def _hold(seconds=0.2):
+    await asyncio.sleep(seconds)
+    return "ok"
+
+
+def test_admission_rejects_full_queue_with_429():
+    async def scenario():
+        ac = AdmissionController("Test", max_concurrent=1, max_queue=1,
+                                 queue_timeout=5, retry_after=3)
+        results = await asyncio.gather(*[ac.run(_hold) for _ in range(3)],
+                                       return_exceptions=True)
+        assert results[:2] == ["ok", "ok"]
+        assert isinstance(results[2], HTTPException)
+        assert results[2].status_code == 429
+        assert results[2].headers == {"Retry-After": "3"}
+        assert ac._admitted == 0
+
+    asyncio.run(scenario())
+
+
+def test_admission_queue_timeout_returns_503():
+    async def scenario():
+        ac = AdmissionController("Test", max_concurrent=1, max_queue=5,
+                                 queue_timeout=0.05, retry_after=2)
+        results = await asyncio.gather(ac.run(_hold), ac.run(_hold),
+                                       return_exceptions=True)
+        assert results[0] == "ok"
+        assert isinstance(results[1], HTTPException)
+        assert results[1].status_code == 503
+        assert results[1].headers == {"Retry-After": "2"}
+        assert ac._admitted == 0
+        # The slot is free again once the running call finishes
+        assert await ac.run(lambda: _hold(0)) == "ok"
+
+    asyncio.run(scenario())
+
+
+def test_admission_counters_reset_after_cancel():
+    async def scenario():
+        ac = AdmissionController("Test", max_concurrent=1, max_queue=1,
+                                 queue_timeout=5, retry_after=1)
+        running = asyncio.ensure_future(ac.run(lambda: _hold(1)))
+        queued = asyncio.ensure_future(ac.run(lambda: _hold(1)))
+        await asyncio.sleep(0.01)
+        assert ac._admitted == 2
+        queued.cancel()
+        running.cancel()
+        await asyncio.gather(running, queued, return_exceptions=True)
+        assert ac._admitted == 0
+        assert await ac.run(lambda: _hold(0)) == "ok"
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"max_concurrent": 0},
+    {"max_queue": -1},
+    {"queue_timeout": 0},
+    {"retry_after": -1},
+])
+def test_admission_rejects_invalid_limits(kwargs):
+    settings = {"max_concurrent": 1, "max_queue": 0, "queue_timeout": 1, "retry_after": 1}
+    settings.update(kwargs)
+    with pytest.raises(ValueError):
+        AdmissionController("Test", **settings)
+
+
+def test_env_setting_reports_bad_value(monkeypatch):
+    monkeypatch.setenv("READ_MAX_QUEUE", "lots")
+    with pytest.raises(ValueError, match="READ_MAX_QUEUE"):
+        main._env_setting("READ_MAX_QUEUE", "256", int)
+
+
+# Endpoints
+
+def test_concurrent_products_keep_caller_category_casing(monkeypatch):
+    monkeypatch.setattr(main, "products_data", main.scraper.scrape_tech_products())
+
+    async def scenario():
+        first, second = await asyncio.gather(
+            main.get_products(category="Storage", search=None, limit=50),
+            main.get_products(category="STORAGE", search=None, limit=50),
+        )
+        assert first.category == "Storage"
+        assert second.category == "STORAGE"
+        assert first.total == second.total > 0
+
+    asyncio.run(scenario())
+
+
+def test_products_endpoint_sheds_excess_load_with_429(monkeypatch):
+    monkeypatch.setattr(main, "products_data", main.scraper.scrape_tech_products())
+    monkeypatch.setattr(main, "read_admission", AdmissionController(
+        "Read", max_concurrent=2, max_queue=3, queue_timeout=5, retry_after=7))
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            # Distinct queries so coalescing does not absorb the burst
+            return await asyncio.gather(*[
+                c.get("/api/products", params={"limit": n}) for n in range(1, 41)
+            ])
+
+    responses = asyncio.run(scenario())
+    shed = [r for r in responses if r.status_code == 429]
+    served = [r for r in responses if r.status_code == 200]
+    assert shed and served
+    assert len(shed) + len(served) == len(responses)
+    assert all(r.headers["Retry-After"] == "7" for r in shed)
+    assert main.read_admission._admitted == 0
+
+
+def test_concurrent_refreshes_share_one_scrape(monkeypatch):
+    calls = 0
+    original = main.scraper.scrape_tech_products
+
+    def counted_scrape():
+        nonlocal calls
+        calls += 1
+        return original()
+
+    async def scenario():
+        results = await asyncio.gather(*[main.refresh_data() for _ in range(10)])
+        assert all(r["total_products"] == len(main.products_data) for r in results)
+
+    monkeypatch.setattr(main, "products_data", main.products_data)
+    monkeypatch.setattr(main.scraper, "scrape_tech_products", counted_scrape)
+    asyncio.run(scenario())
+    assert calls == 1
+
+
+def test_refresh_sheds_callers_when_scrape_hangs(monkeypatch):
+    calls = 0
+    original = main.scraper.scrape_tech_products
+
+    def slow_scrape():
+        nonlocal calls
+        calls += 1
+        time.sleep(0.3)
+        return original()
+
+    async def scenario():
+        return await asyncio.gather(*[main.refresh_data() for _ in range(5)],
+                                    return_exceptions=True)
+
+    monkeypatch.setattr(main, "products_data", main.products_data)
+    monkeypatch.setattr(main.scraper, "scrape_tech_products", slow_scrape)
+    monkeypatch.setattr(main, "refresh_timeout", 0.05)
+    monkeypatch.setattr(main, "refresh_retry_after", 4)
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, HTTPException) for r in results)
+    assert all(r.status_code == 503 for r in results)
+    assert all(r.headers == {"Retry-After": "4"} for r in results)
+    assert calls == 1
+    assert main.coalescer._in_flight == {}